@@ -7,3 +7,32 @@ __author_email__ = "jMujunen@github.com"
 __license__ = "GNU General Public License v3 (GPLv3)"
 __description__ = "A high level interface for files on a file system."
 __url__ = "https://github.com/jMujunen/fsutils"
+
+# The file classes are resolved on first access (PEP 562) so that `import fsutils` stays
+# cheap; `Img` in particular pulls in OpenCV and PIL.
+_LAZY = {
+    "Dir": "fsutils.dir",
+    "File": "fsutils.file",
+    "Git": "fsutils.git",
+    "Img": "fsutils.img",
+    "Log": "fsutils.log",
+    "Video": "fsutils.video",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY])
@@ -1,34 +1,108 @@
 import argparse
 import contextlib
+import logging
+import os
 import sys
-from typing import Any
+from collections.abc import Callable, Iterator
+from itertools import batched, chain
+from operator import attrgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
-from ThreadPoolHelper import Pool
+# Heavy imports are deferred until a command has been parsed so that `--help` and
+# argument errors return immediately
+if TYPE_CHECKING:
+    from fsutils.video import Video
 
-from fsutils.dir import Dir
-from fsutils.video import Video
+# Debug output is off unless `FSUTILS_LOG=DEBUG` is set, so piped output stays clean
+log = logging.getLogger("fsutils")
 
+# `video info --show FIELD`: field name -> Video accessor. Built once at import and
+# read-only, so handlers share it instead of rebuilding a lookup per call
+_SPEC = MappingProxyType({
+    "codec": attrgetter("codec"),
+    "dimensions": attrgetter("dimensions"),
+    "duration": attrgetter("duration"),
+    "bitrate": attrgetter("bitrate_human"),
+    "size": attrgetter("size_human"),
+    "fps": attrgetter("fps"),
+    "aspect_ratio": attrgetter("metadata.aspect_ratio"),
+    "frames": attrgetter("num_frames"),
+    "capture_date": attrgetter("capture_date"),
+})
+# Fields that are answered from the file system without running ffprobe
+_NO_PROBE = frozenset({"size"})
+
+
+# Pre-rendered `fsutils --help` so the top-level help skips building any parser. Keep it in
+# sync with parse_args(), eg. by pasting the output of `parse_args(["--help"])`
+_STATIC_HELP = """\
+usage: fsutils [-h] {video,img,dir} ...
+
+A collection of command line utilities
+
+positional arguments:
+  {video,img,dir}  commands
+    video          Video related operations
+    img            Image related operations
+    dir            Directory related operations
+
+options:
+  -h, --help       show this help message and exit
+"""
 
-def parse_args() -> argparse.Namespace:
-    # ======== MAIN PARSER =============
-    main_parser = argparse.ArgumentParser(
-        prog="fsutils", description="A collection of command line utilities"
-    )
-    subparsers = main_parser.add_subparsers(help="commands", dest="category")
-    # Create the parser for the "video" category
 
-    # |======== Video Parser =========|
+def dump_info(videos: list["Video"], selected: list[tuple[str, Callable]]) -> None:
+    """Write each video's name followed by its `selected` `(field, getter)` values."""
+    for vid in videos:
+        lines = [vid.name, *(f"  {field}: {getter(vid)}" for field, getter in selected)]
+        # One write per file instead of a print per field
+        sys.stdout.write("\n".join(lines) + "\n")
 
-    video_parser = subparsers.add_parser("video", help="Video related operations")
-    video_subparsers = video_parser.add_subparsers(help="video commands", dest="action")
+
+def _usage(parser: argparse.ArgumentParser) -> Callable[[argparse.Namespace], int]:
+    """Return a handler for when no command was given: print `parser`'s help and fail."""
+
+    def handler(_: argparse.Namespace) -> int:
+        parser.print_help()
+        return 1
+
+    return handler
+
+
+def build_video_parser(parser: argparse.ArgumentParser) -> None:
+    """Add the `video` commands and their arguments to `parser`.
+
+    Commands:
+    ---------
+    - `makegif` : Create a GIF from a video file.
+    - `info` : Display information about one or more video files.
+    - `compress` : Compress a video file.
+
+
+    Example usage:
+    --------------
+    >>> # GIF
+    fstuils video makegif input_video.mp4  --scale 750 --fps 15 -k output=output_video.gif
+    # Info
+    fstuils video info ~/Videos/*.mp4
+    fstuils video info ~/Videos/*.mp4 -s codec -s fps
+    # Compress/transcode
+    fstuils video compress video.mp4 -k output=/path/to/result.MOV
+
+    """
+    parser.set_defaults(func=_usage(parser))
+    video_subparsers = parser.add_subparsers(help="video commands", dest="action")
     # Create a parser for the "makegif" category under "video"
     video_makegif_parser = video_subparsers.add_parser(
         "makegif",
         help="Create GIF from video",
     )
+    video_makegif_parser.set_defaults(func=_do_makegif)
     video_makegif_parser.add_argument(
         "PATH",
-        help="Input video file",
+        help="Input video file(s), directories are expanded to the videos inside them",
+        nargs="+",
         type=str,
     )
     video_makegif_parser.add_argument(
@@ -42,11 +116,15 @@ def parse_args() -> argparse.Namespace:
         default=500,
         help="Scale factor for the gif - (100-1000 is usually good).",
     )
+    # An option rather than a trailing positional, which PATH's `+` would swallow
     video_makegif_parser.add_argument(
-        "kwargs",
+        "-k",
+        "--kwargs",
         metavar="KEY=VALUE",
-        nargs=argparse.REMAINDER,
-        help="Optional keyword arguments: --key value",
+        nargs="*",
+        action="extend",
+        default=[],
+        help="Optional keyword arguments for Video.make_gif(), eg. start=3 duration=5",
     )
     # Create a parser for the "info" category under  "video
     # -------- Information -----------
@@ -54,11 +132,21 @@ def parse_args() -> argparse.Namespace:
         "info",
         help="Display information about a video",
     )
+    video_info.set_defaults(func=_do_info)
     video_info.add_argument(
         "PATH",
         nargs="+",
         type=str,
-        help="Video path",
+        help="Video path(s), directories are expanded to the videos inside them",
+    )
+    video_info.add_argument(
+        "-s",
+        "--show",
+        action="append",
+        default=[],
+        choices=[*_SPEC, "all"],
+        metavar="FIELD",
+        help=f"Only show FIELD for each video, can be repeated ({', '.join(_SPEC)}, all)",
     )
 
     # -------- Compression -----------
@@ -66,9 +154,11 @@ def parse_args() -> argparse.Namespace:
         "compress",
         help="Compress a video file",
     )
+    video_compress_parser.set_defaults(func=_do_compress)
     video_compress_parser.add_argument(
         "PATH",
-        help="File(s) paths to compress",
+        help="File(s) paths to compress, directories are expanded to the videos inside them",
+        nargs="+",
         type=str,
     )
     video_compress_parser.add_argument(
@@ -85,17 +175,25 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
     )
     video_compress_parser.add_argument(
-        "kwargs",
-        nargs=argparse.REMAINDER,
-        help="Additional arguments to pass to ffmpeg",
+        "-k",
+        "--kwargs",
+        metavar="KEY=VALUE",
+        nargs="*",
+        action="extend",
+        default=[],
+        help="Additional arguments to pass to ffmpeg, eg. crf=30 output=out.mp4",
     )
-    # |=========== Image Parser ==============|
-    img_parser = subparsers.add_parser("img", help="Image related operations")
-    img_subparsers = img_parser.add_subparsers(help="Image commands", dest="action")
+
+
+def build_img_parser(parser: argparse.ArgumentParser) -> None:
+    """Add the `img` commands and their arguments to `parser`."""
+    parser.set_defaults(func=_usage(parser))
+    img_subparsers = parser.add_subparsers(help="Image commands", dest="action")
     img_info_parser = img_subparsers.add_parser(
         "info",
         help="img info",
     )
+    img_info_parser.set_defaults(func=image_parser)
     # img_info_parser.add_argument(
     #     kwargs="{'nargs': '+'}",
     #     help="Additional arguments to pass to ffmpeg",
@@ -103,15 +201,19 @@ def parse_args() -> argparse.Namespace:
     img_info_parser.add_argument("PATH", help="File path")
 
     resize_parser = img_subparsers.add_parser("resize", help="Resize an image")
+    resize_parser.set_defaults(func=image_parser)
     resize_parser.add_argument("--width", type=int, required=True)
     resize_parser.add_argument("--height", type=int, required=False)
 
-    # |=========== Dir Parser ==============|
-    dir_parser = subparsers.add_parser("dir", help="Directory related operations")
-    dir_subparsers = dir_parser.add_subparsers(help="Directory commands", dest="action")
+
+def build_dir_parser(parser: argparse.ArgumentParser) -> None:
+    """Add the `dir` commands and their arguments to `parser`."""
+    parser.set_defaults(func=_usage(parser))
+    dir_subparsers = parser.add_subparsers(help="Directory commands", dest="action")
     # dir_info = dir_subparsers.add_parser("info", help="Directory info")
 
     dir_serialize = dir_subparsers.add_parser("serialize", help="Serialize directory")
+    dir_serialize.set_defaults(func=_do_serialize)
     dir_serialize.add_argument("PATH", help="Directory to serialize")
     dir_serialize.add_argument(
         "--refresh",
@@ -120,37 +222,55 @@ def parse_args() -> argparse.Namespace:
         help="Set this flag to avoid re-serializing the directory",
         default=True,
     )
-    dir_serialize.add_argument(
-        "--chunk",
-        "-c",
-        help="Chunk refers to how many bytes should be read from each file during the serialization process. A higher number might yield more accurate results at the cost of time/space complexity",
-        default=8196,
-    )
     dir_serialize.add_argument(
         "--prefix", "-p", help="Prepends the given prefix to the pickled file name", default=""
     )
 
     dir_describe = dir_subparsers.add_parser("describe", help="")
+    dir_describe.set_defaults(func=_do_describe)
     dir_describe.add_argument("PATH", help="Target directory")
-    return main_parser.parse_args()
 
 
-def log_parser(arguments: argparse.Namespace) -> None:
-    pass
+# category: (help, builder)
+CATEGORIES = {
+    "video": ("Video related operations", build_video_parser),
+    "img": ("Image related operations", build_img_parser),
+    "dir": ("Directory related operations", build_dir_parser),
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    # ======== MAIN PARSER =============
+    main_parser = argparse.ArgumentParser(
+        prog="fsutils", description="A collection of command line utilities"
+    )
+    main_parser.set_defaults(func=_usage(main_parser))
+    subparsers = main_parser.add_subparsers(help="commands", dest="category")
 
+    # Only the requested category gets its full set of arguments; the others are
+    # registered bare so they still show up in `--help` and as valid choices
+    argv = sys.argv[1:] if argv is None else argv
+    category = next((arg for arg in argv if not arg.startswith("-")), None)
+    for name, (help_, build) in CATEGORIES.items():
+        parser = subparsers.add_parser(name, help=help_)
+        if name == category:
+            build(parser)
+    return main_parser.parse_args(argv)
 
-def dir_parser(arguments: argparse.Namespace) -> int:
-    """Do the thing."""
-    path = Dir(arguments.PATH)
-    match arguments.action:
-        case "serialize":
-            db = path.serialize(replace=arguments.refresh, chunk_size=arguments.chunk)
-            return len(db)
-        case "describe":
-            print(path.describe())
-            return 0
-        case _:
-            return -1
+
+def _do_serialize(arguments: argparse.Namespace) -> int:
+    from fsutils.dir import Dir
+
+    db = Dir(arguments.PATH).serialize(replace=arguments.refresh)
+    print(len(db))
+    return 0
+
+
+def _do_describe(arguments: argparse.Namespace) -> int:
+    from fsutils.dir import Dir
+
+    print(Dir(arguments.PATH).describe())
+    return 0
 
 
 def image_parser(arguments: argparse.Namespace) -> None:
@@ -160,81 +280,141 @@ def image_parser(arguments: argparse.Namespace) -> None:
 def parse_kwargs(*args) -> dict:
     kwargs_dict = {}
     for arg in args:
-        if "=" not in arg:
+        key, sep, value = arg.partition("=")
+        if not sep:
             continue
-        key, value = arg.split("=", 1)
-        with contextlib.suppress(ValueError):
-            value = int(value)  # Try to convert to integer if possible
-        kwargs_dict[key.strip("-")] = value
+        # Convert to integer if possible, checked up front rather than by catching int()'s error
+        kwargs_dict[key.strip("-")] = int(value) if value.removeprefix("-").isdecimal() else value
     return kwargs_dict
 
 
-def video_parser(arguments: argparse.Namespace) -> Any:
-    """Handle command line operations related to videos.
+def _collect(paths: list[str]) -> Iterator[str]:
+    """Yield `paths`, expanding directories into the video files directly inside them."""
+    from fsutils.utils.mimecfg import FILE_TYPES
 
-    Commands:
-    ---------
-    - `makegif` : Create a GIF from a video file.
-    - `info` : Display information about one or more video files.
-    - `compress` : Compress a video file.
+    video_types = FILE_TYPES["video"]
+    for path in paths:
+        if os.path.isdir(path):
+            # DirEntry.is_file() is answered from the directory listing, not a stat per entry
+            with os.scandir(path) as entries:
+                yield from sorted(
+                    entry.path
+                    for entry in entries
+                    if entry.name.lower().endswith(video_types) and entry.is_file()
+                )
+        else:
+            yield path
 
 
-    Example usage:
-    --------------
-    >>> # GIF
-    fstuils video makegif input_video.mp4  --scale 750 --fps 15 -o output_video.gif
-    # Info
-    fstuils video info ~/Videos/*.mp4
-    # Compress/transcode
-    fstuils video compress video.mp4 --output=/path/to/result.MOV
+def _ffmpeg_threads() -> int | None:
+    """Return `FSUTILS_FFMPEG_THREADS`, the `-threads` for each makegif/compress ffmpeg.
 
+    Unset, batches split the cores between their jobs; set to 0 to let ffmpeg decide when
+    running one file at a time. Values that aren't integers are ignored with a warning.
     """
+    value = os.environ.get("FSUTILS_FFMPEG_THREADS")
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        log.warning("Ignoring FSUTILS_FFMPEG_THREADS=%r, expected an integer", value)
+        return None
 
-    def action(videos: list[Video], **kwargs: Any) -> Any:
-        match arguments.action:
-            case "makegif":
-                for vid in videos:
-                    print(kwargs)
-                    vid.make_gif(arguments.scale, arguments.fps, **kwargs)
-                return 0
-            case "info":
-                print(Video.fmtheader())
-                return print("\n".join(Pool().execute(format, videos, progress_bar=False)))
-            case "compress":
-                print("compressing", len(videos))
-
-                for vid in videos:
-                    print(vid)
-                    vid.compress(**kwargs)
-                return 0
-            case _:
-                return f"Invalid video command: {arguments.video} {arguments.action}"
-
-    videos = (
-        [Video(file) for file in arguments.PATH if isinstance(Video(file), Video)]
-        if isinstance(arguments.PATH, list)
-        else [Video(arguments.PATH)]
-    )
+
+def _load_videos(arguments: argparse.Namespace) -> tuple[list["Video"], dict[str, Any]]:
+    """Return the videos named on the command line and any trailing KEY=VALUE options."""
+    from fsutils.video import Video
+
+    # A file given more than once (eg. on its own and inside a listed directory) is only
+    # loaded once, so it isn't probed twice or encoded by two concurrent jobs
+    paths = dict.fromkeys(os.path.abspath(path) for path in _collect(arguments.PATH))
+    videos = [Video(path) for path in paths]
     kwargs = {}
     with contextlib.suppress(AttributeError):
         kwargs = parse_kwargs(*arguments.kwargs)
-    print(kwargs)
-    return action(videos, **kwargs)
+    if (threads := _ffmpeg_threads()) is not None:
+        kwargs.setdefault("threads", threads)
+    log.debug("kwargs=%r", kwargs)
+    return videos, kwargs
+
+
+def _do_makegif(arguments: argparse.Namespace) -> int:
+    videos, kwargs = _load_videos(arguments)
+    if len(videos) == 1:
+        vid = videos[0]
+        output = kwargs.get("output", f"{vid.parent}/{vid.prefix}.gif")
+        # make_gif() prompts before overwriting, so only take the shortcut when
+        # there is nothing to ask
+        if not os.path.exists(output):
+            argv = vid.make_gif_cmd(
+                arguments.scale,
+                arguments.fps,
+                kwargs.get("start", 0),
+                kwargs.get("duration"),
+                output,
+                kwargs.get("threads"),
+            )
+            # Nothing runs after the encode, so replace this process with ffmpeg
+            sys.stdout.flush()
+            os.execvp(argv[0], argv)
+    if len(videos) == 1:
+        videos[0].make_gif(arguments.scale, arguments.fps, **kwargs)
+        return 0
+    from fsutils.video import Video
+
+    # One ffmpeg per file, with the cores split between them
+    try:
+        Video.make_gif_batch(videos, arguments.scale, arguments.fps, **kwargs)
+    except ValueError as e:
+        print(f"\033[31mError:\033[0m {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _do_info(arguments: argparse.Namespace) -> int:
+    from fsutils.video import Video
+
+    videos, _ = _load_videos(arguments)
+    # Resolve the requested fields once rather than per file
+    fields = _SPEC if "all" in arguments.show else dict.fromkeys(arguments.show)
+    selected = [(field, _SPEC[field]) for field in fields]
+    # Probe everything up front in parallel so formatting is in-memory, unless
+    # only fields that come from stat() were asked for
+    if not selected or not fields.keys() <= _NO_PROBE:
+        Video.prefetch_metadata(videos)
+    if selected:
+        dump_info(videos, selected)
+        return 0
+    rows = chain([f"{Video.fmtheader()}\n"], (f"{vid}\n" for vid in videos))
+    # Write rows as they are formatted, a batch per write. On a terminal stdout is line
+    # buffered and would otherwise flush after every row
+    for batch in batched(rows, 256):
+        sys.stdout.write("".join(batch))
+    return 0
+
+
+def _do_compress(arguments: argparse.Namespace) -> int:
+    from fsutils.video import Video
+
+    videos, kwargs = _load_videos(arguments)
+    if "output" in kwargs and len(videos) > 1:
+        # Every encode would write (and `-y` overwrite) the same file
+        print(
+            "\033[31mError:\033[0m output= can only be given for a single video", file=sys.stderr
+        )
+        return 1
+    log.debug("compressing %d videos", len(videos))
+    results = Video.compress_batch(videos, **kwargs)
+    # compress_batch() reports each failure and carries on with the rest
+    return 0 if len(results) == len(videos) else 1
 
 
 if __name__ == "__main__":
+    if len(sys.argv) <= 1 or sys.argv[1] in {"-h", "--help"}:
+        sys.stdout.write(_STATIC_HELP)
+        sys.exit(0 if len(sys.argv) > 1 else 1)
+    logging.basicConfig(level=os.environ.get("FSUTILS_LOG", "WARNING").upper())
     args = parse_args()
-    print(vars(args))
-    template = """{category}.{action}(
-    path={PATH}, {kwargs}"""
-    match args.category:
-        case "video":
-            sys.exit(video_parser(args))
-        case "img":
-            sys.exit(image_parser(args))
-        case "dir":
-            ret = dir_parser(args)
-            print(ret)
-            sys.exit(ret)
-        case _:
-            sys.exit("Invalid category")
+    log.debug("args=%r", vars(args))
+    sys.exit(args.func(args))
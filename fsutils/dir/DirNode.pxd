@@ -39,7 +39,7 @@ cdef class Dir(File):
     cdef public dict[str, list[str]] _db
 
     cpdef list[File] fileobjects(self)
-    cpdef list videos(self)
+    cpdef list videos(self, bool prefetch=?)
     cpdef list images(self)
 
     cpdef list[File] non_media(self)
@@ -58,8 +58,14 @@ class Dir(File):
     def is_empty(self) -> bool:
         """Check if the directory is empty."""
 
-    def videos(self) -> Generator[Video, None, None]:
-        """Return a generator of Video objects for all video files."""
+    def videos(self, prefetch: bool = False) -> list[Video]:
+        """Return a list of Video objects for all video files.
+
+        Set `prefetch` to probe every video up front, concurrently, instead of one at a time on first access.
+        """
+
+    def compress_all(self, **kwargs) -> list[Video]:
+        """Compress every video in the directory concurrently. See `Video.compress_batch()`."""
 
     def images(self) -> Generator[Img, None, None]:
         """Return a generator of Img objects for all image files."""
@@ -1,9 +1,11 @@
 """Represents a directory. Contains methods to list objects inside this directory."""
+import logging
 import os
 import pickle
 import sys
 from collections import defaultdict
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional, Iterator, Generator
 import os
@@ -19,6 +21,8 @@ from fsutils.utils.mimecfg import FILE_TYPES
 from fsutils.video import Video
 from fsutils.utils.tools  import format_bytes
 from fsutils.file.GenericFile cimport File
+
+log = logging.getLogger(__name__)
 cdef class Dir(File):
     """A class representing information about a directory.
 
@@ -96,9 +100,20 @@ cdef class Dir(File):
             return True # type: ignore
         return False # type: ignore
 
-    cpdef list videos(self):
+    cpdef list videos(self, bool prefetch=False):
+        """Return a list of Video objects for all video files.
+
+        Set `prefetch` to probe every video up front, concurrently, instead of one at a time on first access.
+        """
         cdef tuple[str] valid_exts = FILE_TYPES['video']
-        return [Video(file) for file in self.ls_files() if file.lower().endswith(valid_exts)]
+        cdef list videos = [Video(file) for file in self.ls_files() if file.lower().endswith(valid_exts)]
+        if prefetch:
+            Video.prefetch_metadata(videos)
+        return videos
+
+    def compress_all(self, **kwargs) -> list:
+        """Compress every video in the directory concurrently. See `Video.compress_batch()`."""
+        return Video.compress_batch(self.videos(), **kwargs)
 
     cpdef list images(self):
         cdef tuple[str] valid_exts = FILE_TYPES['img']
@@ -182,9 +197,11 @@ cdef class Dir(File):
         if hasattr(self, "_size"):
             if self._size:
                 return self._size
-        awk = "awk '{ print $1 }'"
-        cmd = f'du -bsx "{self.path}" | {awk}'
-        self._size = int(subprocess.getoutput(cmd).splitlines()[-1])
+        # du exits non-zero on unreadable entries but still prints the total
+        du = subprocess.run(
+            ["du", "-bsx", self.path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False
+        )
+        self._size = int(du.stdout.split()[0])
         return self._size
 
     @property
@@ -226,11 +243,10 @@ cdef class Dir(File):
              and the values are lists of file paths.
 
         """
-        cdef (char*, char*) result
-        cdef bytes _sha
-        cdef bytes _path
         cdef str sha
         cdef str path
+        cdef list shard, errors
+        cdef unsigned int done = 0
         cdef dict[str,list[str]] db = {}
 
         self._pkl_path = self._pkl_path.lstrip('.')
@@ -240,19 +256,24 @@ cdef class Dir(File):
         elif Path(self._pkl_path).exists() and replace is False:
             return self.load_database()
 
-        pool = Pool()
-        for result in pool.execute(
-            worker,
-            self._files(),
-            progress_bar=True
-        ):
-            _sha, _path = result
-            sha = _sha.decode('utf-8')
-            path = _path.decode('utf-8')
-            if not sha in db:
-                db[sha] = [path]
-            else:
-                db[sha].append(path)
+        cdef list[str] paths = list(self.ls_files())
+        # Each file costs a stat, a read and two digests plus the Python around them, so the
+        # paths are sharded across processes rather than threads contending for the GIL
+        cdef list shards = [paths[i:i + 256] for i in range(0, len(paths), 256)]
+        with ProcessPoolExecutor() as executor:
+            for shard, errors in executor.map(_hash_shard, shards):
+                for path, error in errors:
+                    log.warning("Could not hash %s: %s", path, error)
+                for sha, path in shard:
+                    if not sha in db:
+                        db[sha] = [path]
+                    else:
+                        db[sha].append(path)
+                if progress_bar:
+                    done += len(shard)
+                    sys.stderr.write(f"\r{done}/{len(paths)}")
+        if progress_bar and paths:
+            sys.stderr.write("\n")
         return db
 
 
@@ -414,8 +435,20 @@ def obj(file_path: str):
     """Return a File instance for the given file path."""
     return _obj(file_path)
 
-cdef inline (char*, char*) worker(File item):
-    """Worker function to process items in parallel."""
-    return item.sha256(), item.path.encode('utf-8') # type: ignore
+def _hash_shard(list paths) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """Hash `paths` in one of `Dir.serialize()`'s worker processes.
+
+    Returns `(sha256, path)` pairs, and `(path, error)` pairs for the files that couldn't
+    be read so the parent can report them.
+    """
+    cdef str path
+    cdef list result = []
+    cdef list errors = []
+    for path in paths:
+        try:
+            result.append(((<File>File(path)).sha256().decode('utf-8'), path))
+        except OSError as e:
+            errors.append((path, repr(e)))
+    return result, errors
 
 
@@ -1,7 +1,5 @@
 import argparse
 
-from .DirNode import Dir
-
 
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
@@ -27,6 +25,9 @@ def parse_args() -> argparse.Namespace:
 
 def main(dir_path: str, action: str, *args, **kwargs) -> int:
     """Execute the given action."""
+    # Imported here so `--help` and argument errors don't load the extension modules
+    from .DirNode import Dir
+
     path = Dir(dir_path)
     match action:
         case "serialize":
@@ -8,16 +8,6 @@ GIT_OBJECT_REGEX: re.Pattern
 ctypedef tuple[datetime, datetime, datetime] DatetimeTuple
 
 
-cdef extern from "stdio.h":
-    ctypedef ssize_t ssize_ts
-    ctypedef size_t size_t
-    ctypedef int FILE
-
-    cdef FILE* fopen(const char* filename, const char* mode)
-    ssize_t fread(void* ptr, size_t size, size_t nmemb, FILE* stream)
-    int fclose(FILE* stream)
-
-
 cdef class File:
     cdef public str _suffix
     cdef public str _stem
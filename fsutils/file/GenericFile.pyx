@@ -12,7 +12,6 @@ from typing import Any, Type, Union
 import chardet
 from fsutils.utils.mimecfg import FILE_TYPES
 from fsutils.utils.tools import format_bytes
-from libc.stdlib cimport free, malloc, realloc
 
 
 GIT_OBJECT_REGEX = re.compile(r"([a-f0-9]{37,41})")
@@ -123,9 +122,10 @@ cdef class File:
     @property
     def stem(self):
         """Return the file name without extension."""
-        cdef str stem, _
-        stem, _ = os.path.splitext(self.name)
-        return stem
+        # Computed once; the path of a File doesn't change after construction
+        if self._stem is None:
+            self._stem = os.path.splitext(self.name)[0]
+        return self._stem
     @stem.setter
     def stem(self, value: str):
         """Set the file name without extension."""
@@ -134,9 +134,9 @@ cdef class File:
     @property
     def suffix(self):
         """Return the file extension."""
-        cdef str _, suffix
-        _, suffix = os.path.splitext(self.path)
-        return suffix
+        if self._suffix is None:
+            self._suffix = os.path.splitext(self.path)[1]
+        return self._suffix
     @suffix.setter
     def  suffix(self, value: str):
         """Set the file extension."""
@@ -245,7 +245,7 @@ cdef class File:
         return self.exists()
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(name={self.name}, encoding={self.encoding}, size={self.size_human}"
+        return f"{self.__class__.__name__}(name={self.name}, encoding={self.encoding}, size={self.size_human})"
 
     cpdef str detect_encoding(self):# -> str:
         """Detect encoding of the file."""
@@ -293,33 +293,11 @@ cdef class File:
 
 cdef bytes c_read_chunk(File self, unsigned int size=16384):
     """Read a chunk of data from the file."""
-    cdef char* buffer
-    cdef ssize_t bytes_read
-    cdef FILE* fptr
-
-    # Allocate memory for the buffer
-    buffer = <char*>malloc(size * sizeof(char)) # type: ignore
-    if not buffer:
-        raise MemoryError("Failed to allocate memory for buffer")
-
+    # A single read(2) straight into the returned bytes object. Going through stdio copied
+    # the data into a malloc'd buffer first and then again into the bytes object
+    cdef int fd = os.open(self.path, os.O_RDONLY)
     try:
-        # Open the file in binary read mode
-        fptr = fopen(self.path.encode('utf-8'), 'rb'.encode('utf-8'))# type: ignore
-        if not fptr:
-            raise IOError(f"Failed to open file: {self.path}")
-
-        try:
-            # Read data into the buffer
-            bytes_read = fread(buffer, 1, size, fptr)# type: ignore
-            if bytes_read < 0:# type: ignore
-                raise IOError("Error reading from file")
-
-            # Convert the buffer to a Python bytes object and return it
-            return bytes(buffer[:bytes_read]) # type: ignore
-        finally:
-            # Close the file
-            fclose(fptr)
+        return os.read(fd, size)
     finally:
-        # Free the allocated memory for the buffer
-        free(buffer) # type: ignore
+        os.close(fd)
 
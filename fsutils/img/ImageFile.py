@@ -20,6 +20,11 @@ ENCODE_SPEC = {".jpg": "JPEG", ".gif": "GIF", ".png": "JPEG"}
 
 Dims = namedtuple("Dims", ["width", "height"])
 
+# EXIF tag ids whose name starts with "DateTime", so `capture_date` can test ids directly
+_DATETIME_TAG_IDS = frozenset(
+    tag_id for tag_id, name in TAGS.items() if name.startswith("DateTime")
+)
+
 
 class Img(File):  # noqa - FIXME: Too many methods
     """Represents an image.
@@ -44,6 +49,7 @@ class Img(File):  # noqa - FIXME: Too many methods
             - `path (str)` : The absolute path to the file.
         """
         super().__init__(path)
+        self._exif = None
 
     def calculate_hash(self, spec: str = "avg") -> imagehash.ImageHash:
         """Calculate the hash value of the image.
@@ -60,6 +66,10 @@ class Img(File):  # noqa - FIXME: Too many methods
         if self.suffix == ".heic" or self.is_corrupt:
             pass
         with Image.open(self.path) as img:
+            # All three hashes shrink the image to at most 32x32 grayscale, so let the JPEG
+            # decoder scale it down by up to 8x via the DCT instead of decoding every pixel.
+            # No-op for other formats
+            img.draft("L", (256, 256))
             match spec:
                 case "avg":
                     img_hash = imagehash.average_hash(img)
@@ -76,12 +86,19 @@ class Img(File):  # noqa - FIXME: Too many methods
         with Image.open(self.path) as img:
             return Dims(*img.size)
 
+    @property
+    def exif(self) -> dict[int, Any]:
+        """Return the EXIF data as `{tag_id: value}`, read from the file on first access."""
+        if self._exif is None:
+            with Image.open(self.path) as img:
+                self._exif = dict(img.getexif())
+        return self._exif
+
     @property
     def tags(self) -> list[tuple[str, Any]]:
         """Return a list of all tags in the EXIF data."""
         _tags = []
-        with Image.open(self.path) as img:
-            exif = img.getexif()
+        exif = self.exif
         for tag_id in exif:
             try:
                 tags = TAGS.get(tag_id, tag_id)
@@ -93,7 +110,6 @@ class Img(File):  # noqa - FIXME: Too many methods
                 tag = (tags, data)
                 if tag not in _tags:
                     _tags.append(tag)
-                _tags.append(tag)
             except UnicodeDecodeError:
                 continue
             except Exception as e:
@@ -104,9 +120,11 @@ class Img(File):  # noqa - FIXME: Too many methods
     @property
     def capture_date(self) -> datetime:
         """Return the capture date of the image if it exists in the EXIF data."""
-        for idx, val in self.tags:
+        for tag_id, val in self.exif.items():
             try:
-                if idx.startswith("DateTime"):
+                if tag_id in _DATETIME_TAG_IDS:
+                    if isinstance(val, bytes):
+                        val = val.decode()
                     date, time = val.split(" ")
                     year, month, day = date.split(":")
                     hour, minute, second = time.split(":")
@@ -159,8 +177,7 @@ class Img(File):  # noqa - FIXME: Too many methods
             )  # Vain attempt to center the title
             print(f"\033[1m{title.center(pos)}\033[0m")
         return subprocess.run(
-            f'kitten icat --use-window-size 100,100,320,100 "{path}"',
-            shell=True,
+            ["kitten", "icat", "--use-window-size", "100,100,320,100", path],
             check=False,
         ).returncode
 
@@ -184,8 +201,7 @@ class Img(File):  # noqa - FIXME: Too many methods
                 )  # Vain attempt to center the title
                 print(f"\033[1m{title.center(pos)}\033[0m")
             return subprocess.run(
-                f'kitten icat --use-window-size 100,100,{render_size},100 "{self.path}"',
-                shell=True,
+                ["kitten", "icat", "--use-window-size", f"100,100,{render_size},100", self.path],
                 check=False,
             ).returncode
 
@@ -303,6 +319,10 @@ class Img(File):  # noqa - FIXME: Too many methods
 
     def encode(self) -> str:
         """Base64 encode the image."""
+        if self.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}:
+            # The file is already encoded in its own format, so decoding and re-encoding it
+            # with cv2 would only cost time and quality
+            return base64.b64encode(Path(self.path).read_bytes()).decode("utf-8")
         # resized = self.resize()
         img = cv2.imread(self.path)
         cv_img = cv2.imencode(self.suffix, img)
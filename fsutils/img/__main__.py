@@ -20,12 +20,16 @@ fstuils image compress image.mp4 --output=/path/to/result.MOV
 
 import argparse
 import contextlib
-from typing import Any
-
-from ThreadPoolHelper import Pool
+import logging
+import os
+import sys
+from typing import TYPE_CHECKING, Any
 
 from ..utils.mimecfg import FILE_TYPES
-from .ImageFile import Img
+
+# Img pulls in OpenCV and PIL, so it is only imported once the arguments have been parsed
+if TYPE_CHECKING:
+    from .ImageFile import Img
 
 image_types = tuple(FILE_TYPES["img"])
 
@@ -104,7 +108,9 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def main(images: list[Img], action: str, **kwargs) -> Any:
+def main(images: list["Img"], action: str, **kwargs) -> Any:
+    from .ImageFile import Img
+
     match action:
         case "makegif":
             if "quality" in kwargs:
@@ -115,8 +121,19 @@ def main(images: list[Img], action: str, **kwargs) -> Any:
             for vid in images:
                 vid.make_gif(**kwargs)
         case "info":
+            from concurrent.futures import ThreadPoolExecutor
+
             print(Img.fmtheader())
-            print("\n".join(sorted(Pool().execute(format, images, progress_bar=False))))
+            # Order by name up front so rows can be written as each one is ready, in order,
+            # instead of collecting and joining them all first
+            images.sort(key=lambda img: img.name)
+            if len(images) < 8:
+                # Too few to win back the cost of starting the pool's threads
+                sys.stdout.writelines(f"{img}\n" for img in images)
+                return
+            with ThreadPoolExecutor() as executor:
+                for row in executor.map(format, images):
+                    sys.stdout.write(f"{row}\n")
         case "compress":
             for vid in images:
                 try:
@@ -130,21 +147,24 @@ def main(images: list[Img], action: str, **kwargs) -> Any:
 def parse_kwargs(*args) -> dict:
     kwargs_dict = {}
     for arg in args:
-        if "=" not in arg:
+        key, sep, value = arg.partition("=")
+        if not sep:
             continue
-        key, value = arg.split("=", 1)
-        with contextlib.suppress(ValueError):
-            value = int(value)  # Try to convert to integer if possible
-        kwargs_dict[key.strip("-")] = value
+        # Convert to integer if possible, checked up front rather than by catching int()'s error
+        kwargs_dict[key.strip("-")] = int(value) if value.removeprefix("-").isdecimal() else value
     return kwargs_dict
 
 
 if __name__ == "__main__":
     args = parse_args()
-    print("VIDEOS: ", args.PATH)
+    from .ImageFile import Img
+
+    logging.basicConfig(level=os.environ.get("FSUTILS_LOG", "WARNING").upper())
+    log = logging.getLogger("fsutils")
+    log.debug("paths=%r", args.PATH)
     kwargs = {}
     with contextlib.suppress(AttributeError):
         kwargs = parse_kwargs(*args.kwargs)
     images = [Img(vid) for vid in args.PATH if vid.endswith(image_types)]
-    print(kwargs)
+    log.debug("kwargs=%r", kwargs)
     main(images=images, action=args.action, **kwargs)
@@ -3,8 +3,6 @@
 from datetime import timedelta
 from enum import Enum
 
-import numpy as np
-
 SECONDS_PER_HOUR = 60 * 60
 
 
@@ -30,6 +28,8 @@ def format_timedelta(td: timedelta) -> str:
 
 def frametimes(num_frames: int, clip_fps: int, saving_fps: int) -> list[int]:
     """Return the list of durations where to save the frames."""
+    import numpy as np
+
     print("num frames:", num_frames)
     print("clip fps:", clip_fps)
     print("saving fps:", saving_fps)
@@ -1,13 +1,264 @@
-"""Python wrapper for ffprobe command line tool. ffprobe must exist in the path."""
+"""Python wrapper for ffprobe command line tool. ffprobe must exist in the path.
 
-import functools
+`FFProbe(path)` reports every format and stream field. `Video` probes with the `"video"`
+profile instead, which only asks for the fields it reads and, when PyAV is installed,
+reads the container in-process through libav rather than spawning an ffprobe per file.
+"""
+
+import contextlib
+import hashlib
 import json
-import operator
+import os
 import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cache, lru_cache
+from itertools import repeat
 from pathlib import Path
+from typing import Any
 from fsutils.utils.Exceptions import CorruptMediaError, FFProbeError
 
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    import av
+except ImportError:
+    av = None
+
+# Parsed ffprobe output is cached here, keyed on the file's size and mtime.
+# Set `FSUTILS_NO_CACHE` to bypass the cache entirely.
+_PROBE_CACHE_DIR = Path(os.environ.get("FSUTILS_CACHE", "~/.cache/fsutils")).expanduser()
+# Entries older than this are removed by `prune_cache()`
+PROBE_CACHE_TTL = 14 * 24 * 60 * 60
+
+# Container and stream info are requested together so a file is only probed once. The
+# "video" profile only emits the entries `Video` reads instead of every field
+_FFPROBE_ENTRIES = ":".join((
+    "format=filename,format_name,duration,bit_rate",
+    "format_tags",
+    "stream=index,codec_type,codec_name,codec_long_name,width,height,pix_fmt,"
+    "display_aspect_ratio,avg_frame_rate,r_frame_rate,duration,bit_rate,nb_frames",
+    "stream_tags",
+))
+_FFPROBE_BASE = ("ffprobe", "-v", "quiet", "-print_format", "json")
+# profile -> ffprobe command
+_FFPROBE_CMDS = {
+    "full": (*_FFPROBE_BASE, "-show_format", "-show_streams"),
+    "video": (*_FFPROBE_BASE, "-show_entries", _FFPROBE_ENTRIES),
+}
+# Encoded once here; subprocess would otherwise fsencode every argument on each spawn
+_FFPROBE_ARGV = {
+    profile: tuple(os.fsencode(arg) for arg in cmd) for profile, cmd in _FFPROBE_CMDS.items()
+}
+
+# Identifies which backend produced a cache entry for each profile
+# (a list, so it compares equal to the key read back from json)
+_PROBE_BACKEND = {profile: list(cmd) for profile, cmd in _FFPROBE_CMDS.items()}
+if av is not None:
+    _PROBE_BACKEND["video"] = "libav"
+
+
+def _run_ffprobe(filepath: str, profile: str = "full") -> dict[str, Any]:
+    """Run ffprobe on `filepath` and return the parsed json output."""
+    # Parse the raw bytes directly rather than decoding stdout to text first.
+    # Python opens fds as non-inheritable, so skipping close_fds is safe and avoids
+    # scanning every open descriptor on each spawn.
+    proc = subprocess.Popen(
+        (*_FFPROBE_ARGV[profile], os.fsencode(filepath)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        close_fds=False,
+    )
+    stdout, _ = proc.communicate()
+    if proc.returncode:
+        raise FFProbeError(f"ffprobe could not read {filepath} (exit status {proc.returncode})")
+    return _loads(stdout)
+
+
+def _fraction(rate: Any) -> str | None:
+    return f"{rate.numerator}/{rate.denominator}" if rate else None
+
+
+def _run_libav(filepath: str) -> dict[str, Any]:
+    """Read `filepath` with PyAV and return it in the same layout as ffprobe's json output.
+
+    Only the keys `FFProbe` and `Video` rely on are filled in, and keys without a
+    value are left out rather than set to `N/A`. Like `_run_ffprobe()`, raises
+    `FFProbeError` if the file can't be read.
+    """
+    try:
+        container = av.open(filepath)
+    except Exception as e:
+        # Besides `av.error.FFmpegError`, older PyAV releases raise `UnicodeDecodeError` on
+        # undecodable metadata. Either way the file is unreadable, as far as callers care
+        raise FFProbeError(f"libav could not read {filepath}: {e!r}") from e
+
+    with container:
+        fmt = {"filename": filepath, "format_name": container.format.name}
+        if container.duration:
+            fmt["duration"] = str(container.duration / av.time_base)
+        if container.bit_rate:
+            fmt["bit_rate"] = str(container.bit_rate)
+        fmt["tags"] = dict(container.metadata)
+
+        streams = []
+        for stream in container.streams:
+            # Streams libav has no decoder for (eg. the tmcd/mebx data tracks in phone
+            # .MOV files) come without a codec context
+            codec_context = stream.codec_context
+            info = {
+                "index": stream.index,
+                "codec_type": stream.type,
+                "codec_name": codec_context.name if codec_context else None,
+                "tags": dict(stream.metadata),
+            }
+            if codec_context is not None and codec_context.codec is not None:
+                info["codec_long_name"] = codec_context.codec.long_name
+            if stream.bit_rate:
+                info["bit_rate"] = str(stream.bit_rate)
+            if stream.duration and stream.time_base:
+                info["duration"] = str(float(stream.duration * stream.time_base))
+            if stream.frames:
+                info["nb_frames"] = str(stream.frames)
+            if stream.type == "video" and codec_context is not None:
+                info["width"] = codec_context.width
+                info["height"] = codec_context.height
+                info["pix_fmt"] = codec_context.pix_fmt
+                if dar := stream.display_aspect_ratio:
+                    info["display_aspect_ratio"] = f"{dar.numerator}:{dar.denominator}"
+                info["avg_frame_rate"] = _fraction(stream.average_rate) or "0/0"
+                info["r_frame_rate"] = _fraction(stream.base_rate) or "0/0"
+            streams.append(info)
+    return {"format": fmt, "streams": streams}
+
+
+def _probe(filepath: str, profile: str = "full") -> dict[str, Any]:
+    if profile == "video" and av is not None:
+        return _run_libav(filepath)
+    return _run_ffprobe(filepath, profile)
+
+
+def _cached_probe(filepath: str, profile: str = "full") -> dict[str, Any]:
+    """Return the ffprobe output for `filepath`, reusing a cached result when it is fresh.
+
+    Results are kept in memory for the life of the process and on disk across runs.
+    """
+    if os.environ.get("FSUTILS_NO_CACHE"):
+        return _probe(filepath, profile)
+
+    filepath = os.path.abspath(filepath)
+    st = os.stat(filepath)
+    return _probe_once(filepath, st.st_size, st.st_mtime_ns, profile)
+
+
+@lru_cache(maxsize=4096)
+def _probe_once(filepath: str, size: int, mtime_ns: int, profile: str) -> dict[str, Any]:
+    # Size and mtime are arguments so a modified file misses both caches. The backend is
+    # part of the on-disk key so entries written with different flags are refreshed
+    key = [size, mtime_ns, _PROBE_BACKEND[profile]]
+    name = hashlib.sha1(filepath.encode()).hexdigest()
+    # Each profile has its own entry so the two don't keep replacing each other
+    suffix = ".json" if profile == "full" else f".{profile}.json"
+    cache_file = _PROBE_CACHE_DIR / f"{name}{suffix}"
+
+    with contextlib.suppress(OSError, ValueError):
+        cached = _loads(cache_file.read_bytes())
+        if cached.get("key") == key:
+            return cached["probe"]
+
+    data = _probe(filepath, profile)
+    if not data.get("streams"):
+        # Raising keeps failed probes out of the in-memory cache too
+        raise FFProbeError(f"No streams found in file {filepath}")
+    with contextlib.suppress(OSError):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a private temp file and rename it into place so concurrent
+        # processes sharing the cache never read a partially written entry
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_bytes(_dumps({"key": key, "probe": data}))
+        os.replace(tmp_file, cache_file)
+        _prune_once()
+    return data
+
+
+@cache
+def _prune_once() -> None:
+    """Expire old cache entries the first time this process writes one."""
+    prune_cache()
+
+
+def prune_cache(max_age: float = PROBE_CACHE_TTL) -> int:
+    """Delete probe cache entries written more than `max_age` seconds ago.
+
+    Entries are keyed on a file's size and mtime, so they never go stale, but entries for
+    files that were moved or deleted are otherwise kept forever. Called automatically
+    once per process, on the first write to the cache.
+
+    Returns
+    -------
+        - `int` : The number of entries removed
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    with contextlib.suppress(FileNotFoundError), os.scandir(_PROBE_CACHE_DIR) as entries:
+        for entry in entries:
+            with contextlib.suppress(OSError):
+                if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+    return removed
+
+
+def _readahead(filepath: str, length: int = 1 << 16) -> None:
+    """Ask the kernel to start reading the head of `filepath` in the background."""
+    with contextlib.suppress(OSError, AttributeError):
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, length, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
+def probe_many(
+    filepaths: Iterable[str], max_workers: int | None = None, profile: str = "full"
+) -> dict[str, "FFProbe"]:
+    """Probe several files concurrently.
+
+    Each probe is an ffprobe child process (or a libav call that releases the GIL),
+    so threads are enough to run one per core.
+    Files that cannot be probed are left out of the result.
+
+    Parameters
+    ------------
+        - `filepaths (Iterable[str])` : Paths to probe
+        - `max_workers (int)` : Number of concurrent probes (default is `os.cpu_count()`)
+        - `profile (str)` : See `FFProbe` (default is `"full"`)
+    """
+    filepaths = list(filepaths)
+    # Queue up the container headers for every file now, so the disk reads for files
+    # further down the list overlap with the probes that are already running
+    for filepath in filepaths:
+        _readahead(filepath)
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        probes = executor.map(_probe_or_none, filepaths, repeat(profile))
+        return {path: probe for path, probe in zip(filepaths, probes) if probe is not None}
+
+
+def _probe_or_none(filepath: str, profile: str = "full") -> "FFProbe | None":
+    try:
+        return FFProbe(filepath, profile)
+    except (FFProbeError, OSError, ValueError):
+        return None
+
 
 class FFStream:
     """An object representation of an individual stream in a multimedia file."""
@@ -57,19 +308,13 @@ class FFStream:
     def __init__(self, index: dict) -> None:
         """Initialize the FFStream object."""
         self.__dict__.update(index)
+        num, _, den = self.__dict__.get("avg_frame_rate", "").partition("/")
         try:
-            self.__dict__["framerate"] = round(
-                functools.reduce(
-                    operator.truediv,
-                    map(int, self.__dict__.get("avg_frame_rate", "").split("/")),
-                )
-            )
+            self.__dict__["framerate"] = round(int(num) / int(den or 1))
         except ValueError:
             self.__dict__["framerate"] = None
         except ZeroDivisionError:
             self.__dict__["framerate"] = 0
-            for k, v in self.__dict__.items():
-                setattr(self, k, v)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({',\n\t'.join(f'{k}={v!r}' for k, v in self.__dict__.items())}\n)"
@@ -169,7 +414,7 @@ class FFStream:
         """Return the frames per second as an integer."""
         try:
             return int(self.__dict__.get("framerate", ""))
-        except ValueError:
+        except (TypeError, ValueError):
             try:
                 return int(self.__dict__.get("r_frame_rate", "").split("/")[0])
             except Exception:
@@ -187,20 +432,26 @@ class FFProbe:
     """
 
     streams: list[FFStream]
+    format: dict[str, Any]
 
-    def __init__(self, filepath: str) -> None:
+    def __init__(self, filepath: str, profile: str = "full") -> None:
         """Initialize the FFProbe object.
 
         Parameters
         ------------
             - `path_to_video (str)` : Path to video file.
+            - `profile (str)` : `"full"` reports every format and stream field. `"video"`
+                                only reports the fields `Video` reads, which is faster
         """
-        self.streams = []
-        cmd = 'ffprobe -print_format json -show_streams "{path}" -v quiet'
-        data = json.loads(subprocess.getoutput(cmd.format(path=filepath))).get("streams", [])
+        probe = _cached_probe(str(filepath), profile)
+        data = probe.get("streams", [])
 
         if not data:
             raise FFProbeError(f"No streams found in file {filepath}")
 
-        for stream in data:
-            self.streams.append(FFStream(stream))
+        self.format = probe.get("format", {})
+        self.streams = [FFStream(stream) for stream in data]
+
+    def video_stream(self) -> FFStream | None:
+        """Return the first video stream, or None if there isn't one."""
+        return next((stream for stream in self.streams if stream.is_video()), None)
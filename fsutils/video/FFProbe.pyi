@@ -1,5 +1,18 @@
 """Type annotations for FFProbe."""
 
+from collections.abc import Iterable
+from typing import Any
+
+PROBE_CACHE_TTL: int
+
+def prune_cache(max_age: float = ...) -> int:
+    """Delete probe cache entries written more than `max_age` seconds ago."""
+
+def probe_many(
+    filepaths: Iterable[str], max_workers: int | None = None, profile: str = "full"
+) -> dict[str, FFProbe]:
+    """Probe several files concurrently."""
+
 class FFStream:
     """An object representation of an individual stream in a multimedia file."""
 
@@ -103,12 +116,18 @@ class FFProbe:
     """
 
     streams: list[FFStream]
-    def __init__(self, filepath: str) -> None:
+    format: dict[str, Any]
+    def __init__(self, filepath: str, profile: str = "full") -> None:
         """Initialize the FFProbe object.
 
         Parameters
         ------------
             - `path_to_video (str)` : Path to video file.
+            - `profile (str)` : `"full"` reports every format and stream field. `"video"`
+                                only reports the fields `Video` reads, which is faster
         """
 
+    def video_stream(self) -> FFStream | None:
+        """Return the first video stream, or None if there isn't one."""
+
     def __repr__(self) -> str: ...
@@ -1,36 +1,129 @@
-"""Video: Represents a video file. Has methods to extract metadata like fps, aspect ratio etc."""
+"""Video: Represents a video file. Has methods to extract metadata like fps, aspect ratio etc.
+
+OpenCV, numpy and `Img` (which pulls in PIL and imagehash) are imported inside the methods
+that need them so that probing metadata doesn't pay for them.
+"""
+
+from __future__ import annotations
 
-import contextlib
 import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import cache
 from pathlib import Path
-from typing import Any
-import cv2
+from typing import TYPE_CHECKING, Any
 
 from fsutils.file import File
-from fsutils.img import Img
 from fsutils.utils.tools import format_bytes, format_timedelta, frametimes
 from fsutils.utils.Exceptions import CorruptMediaError, FFProbeError
-from fsutils.video.FFProbe import FFProbe, FFStream
+from fsutils.video.FFProbe import FFProbe, FFStream, probe_many
+from fsutils.video._mp4 import MP4_SUFFIXES, mp4_video_header
 from dataclasses import dataclass, field
 
-cv2.setLogLevel(1)
+if TYPE_CHECKING:
+    import numpy as np
+
+    from fsutils.img import Img
+
+# Column layout of `Video.__format__` and `Video.fmtheader()`, parsed once. Every field goes
+# through `str()` first so missing values (`None`) render instead of raising
+_format_row = " | ".join(["{!s:<25}", *["{!s:<10}"] * 7]).format
+
+# Consumer NVIDIA GPUs only allow a couple of concurrent NVENC sessions
+NVENC_SESSIONS = int(os.environ.get("FSUTILS_NVENC_SESSIONS", 2))
+
+# `extract_frames` seeks only when the next frame is more than this many seconds ahead, which
+# is around the keyframe interval of typical encodes; closer frames are decoded forward to
+_SEEK_GAP = 2.0
+# Frames `extract_frames` holds in memory while they wait to be written
+_MAX_PENDING_WRITES = 8
+
+
+def _cv2() -> Any:
+    """Import opencv on first use. It is slow to load and only needed for frame access."""
+    import cv2
+
+    cv2.setLogLevel(1)
+    return cv2
 
 
-class VideoStream(FFProbe):
-    """Wrapper around FFProbe."""
+@cache
+def _has_encoder(name: str) -> bool:
+    """Return True if the local ffmpeg build lists `name` among its encoders."""
+    try:
+        encoders = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return f" {name} ".encode() in encoders
 
-    def __init__(self, path: str | Path) -> None:
-        """Init probe."""
-        super().__init__(path)
-        for stream in self.streams:
-            if stream.is_video:
-                dictitems = stream.__dict__.copy()
-                self.__dict__.update(dictitems)
-                for k, v in dictitems.items():
-                    setattr(self, k, v)
+
+@cache
+def _has_hwaccel(name: str) -> bool:
+    """Return True if the local ffmpeg build lists `name` among its hwaccels."""
+    try:
+        output = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-hwaccels"], capture_output=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    # The first line is the "Hardware acceleration methods:" header
+    return name.encode() in output.split()[3:]
+
+
+def _run_with_log_tail(cmd: list[str], keep: int = 200) -> None:
+    """Run `cmd` with its stderr drained into a ring buffer of the last `keep` lines.
+
+    Raises `CalledProcessError` carrying that tail if the command fails.
+    """
+    with subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    ) as proc:
+        tail = deque(proc.stderr, maxlen=keep)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="".join(tail))
+
+
+def _start_with_log_tail(
+    cmd: list[str], keep: int = 200
+) -> tuple[subprocess.Popen, deque[str], threading.Thread]:
+    """Start `cmd` with a thread draining its stderr into a ring buffer of the last `keep` lines.
+
+    The caller waits for the process and joins the thread before reading the tail.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    tail: deque[str] = deque(maxlen=keep)
+    drain = threading.Thread(target=tail.extend, args=(proc.stderr,), daemon=True)
+    drain.start()
+    return proc, tail, drain
+
+
+def _write_jpeg(path: Path, frame: Any, quality: int = 90) -> Path:
+    """Encode a frame as JPEG and write it to `path`."""
+    cv2 = _cv2()
+    _, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    path.write_bytes(buf.tobytes())
+    return path
 
 
 @dataclass
@@ -43,6 +136,9 @@ class CompressOptions:
     preset: str = "fast"
     tune: str = "hq"
     loglevel: str = "quiet"
+    threads: int = 0
+    progress: bool = True
+    filter_threads: int = field(default_factory=lambda: os.cpu_count() or 1)
     output: str = field(default_factory=str)
 
     @classmethod
@@ -51,17 +147,45 @@ class CompressOptions:
         return cls(**options)
 
 
+@dataclass(slots=True, frozen=True)
+class StreamInfo:
+    """The video stream fields read by `Video`, extracted once from the probe."""
+
+    codec: str | None
+    width: int
+    height: int
+    fps: int
+    bitrate: int
+
+    @classmethod
+    def from_stream(cls, stream: FFStream, fmt: dict[str, Any]) -> "StreamInfo":
+        """Create an instance of StreamInfo from a video stream and its container format."""
+        # Some containers (eg. mkv) only report the bitrate at the format level
+        try:
+            bitrate = int(stream.__dict__.get("bit_rate") or fmt.get("bit_rate") or 0)
+        except ValueError:
+            bitrate = 0
+        return cls(
+            codec=stream.codec,
+            width=int(stream.__dict__.get("width") or 0),
+            height=int(stream.__dict__.get("height") or 0),
+            fps=stream.frame_rate,
+            bitrate=bitrate,
+        )
+
+
 class Video(File):  # noqa: PLR0904
     """A class representing information about a video.
 
     | Method | Description |
     | :---------------- | :-------------|
-    | `metadata()`     | Extract video metadata |
+    | `metadata`       | The first video stream from ffprobe |
     | `compress()` | Compress the video using ffmpeg |
-    | `make_gif(scale, fps, output)` | Create a gif from the video |
+    | `compress_batch(videos)` | Compress several videos concurrently |
+    | `make_gif(scale, fps, start, duration, output)` | Create a gif from the video |
     | `extract_frames()` | Extract frames from the video |
-    | `render()`       | Render the video using ffmpeg |
-    | `trim()`         | Trim the video using ffmpeg |
+    | `iter_frames()`  | Stream decoded frames as numpy arrays |
+    | `subclip(start, end, output)` | Cut a section of the video using ffmpeg |
 
     ---------------
     ### Attributes:
@@ -77,6 +201,18 @@ class Video(File):  # noqa: PLR0904
         - `bitrate`
     """
 
+    # `File` is an extension type with a fixed layout, so declaring slots here keeps
+    # instances free of a per-instance dict. Lazily computed values get their own slot
+    # rather than using `cached_property`, which needs `__dict__`.
+    __slots__ = (
+        "_capture_date",
+        "_duration",
+        "_is_corrupt",
+        "_metadata",
+        "_probe",
+        "_stream_info",
+    )
+
     def __init__(self, path: str | Path, *args, **kwargs) -> None:
         """Initialize a new Video object.
 
@@ -87,99 +223,162 @@ class Video(File):  # noqa: PLR0904
         """
         super().__init__(path, *args, **kwargs)
         self._metadata = None
+        self._probe = None
+        self._stream_info = None
+        self._duration = None
+        self._capture_date = None
+        self._is_corrupt = None
+
+    @property
+    def probe(self) -> FFProbe:
+        """Return the ffprobe output (container format and streams) for the video."""
+        if self._probe is None:
+            # Only the fields Video reads; use FFProbe(path) for every stream field
+            self._probe = FFProbe(self.path, "video")
+        return self._probe
+
+    @classmethod
+    def prefetch_metadata(
+        cls, videos: Iterable["Video | str | Path"], max_workers: int | None = None
+    ) -> list["Video"]:
+        """Probe several videos concurrently so later metadata access doesn't spawn ffprobe.
+
+        Parameters
+        ----------
+            - `videos (Iterable[Video | str])` : The videos, or paths to videos, to probe
+            - `max_workers (int)` : Number of concurrent probes (default is `os.cpu_count()`)
+
+        Returns
+        -------
+            - `list[Video]` : The probed videos, in the order given
+        """
+        videos = [vid if isinstance(vid, Video) else cls(str(vid)) for vid in videos]
+        pending = {vid.path: vid for vid in videos if vid._probe is None}
+        for path, probe in probe_many(pending, max_workers, "video").items():
+            pending[path]._probe = probe
+        return videos
 
     @property
     def metadata(self) -> FFStream:
         """Extract the metadata of the video."""
         if self._metadata is None:
-            probe = FFProbe(self.path)
-            for stream in probe.streams:
-                if stream.is_video():
-                    self._metadata = stream
-                    break
-            else:
+            self._metadata = self.probe.video_stream()
+            if self._metadata is None:
                 raise ValueError(f"No video stream found in {self.name}")
 
         return self._metadata
 
+    @property
+    def stream_info(self) -> StreamInfo:
+        """Return the video stream fields, parsed once from the probe."""
+        if self._stream_info is None:
+            self._stream_info = StreamInfo.from_stream(self.metadata, self.probe.format)
+        return self._stream_info
+
     @property
     def bitrate(self) -> int:
-        """Extract the bitrate/s with metadata."""
-        try:
-            return round(int(self.metadata.bit_rate))
-        except ZeroDivisionError:
-            if self.is_corrupt:
-                print(f"\033[31m{self.name} is corrupt!\033[0m")
-            return 0
+        """Extract the bitrate/s with metadata. `0` when neither the stream nor the container reports one."""
+        return self.stream_info.bitrate
 
     @property
     def bitrate_human(self) -> str | None:
         """Return the bitrate in a human readable format."""
-        if self.bitrate is not None and self.bitrate > 0:
-            return format_bytes(self.bitrate)
+        bitrate = self.bitrate
+        if bitrate is not None and bitrate > 0:
+            return format_bytes(bitrate)
         return None
 
     @property
     def duration(self) -> int:
-        return round(float(self.metadata.duration))
+        if self._duration is None:
+            self._duration = round(
+                float(self.metadata.__dict__.get("duration") or self.probe.format["duration"])
+            )
+        return self._duration
 
     @property
     def capture_date(self) -> datetime:
         """Return the capture date of the file."""
+        if self._capture_date is None:
+            self._capture_date = self._parse_capture_date()
+        return self._capture_date
+
+    def _parse_capture_date(self) -> datetime:
         try:
-            date, time = self.metadata.tags.get("creation_time", "").split("T")
-            year, month, day = date.split("-")
-            hour, minute, second = time.split(".")[0].split(":")
-            return datetime(
-                int(year),
-                int(month),
-                int(day),
-                int(hour),
-                int(minute),
-                int(second[:2]),
-            )
+            # eg. 2024-08-13T14:54:01.000000Z. fromisoformat parses this as-is, the zone
+            # is dropped so it compares with the naive mtime fallback
+            creation_time = self.metadata.tags.get("creation_time")
+            if creation_time:
+                return datetime.fromisoformat(creation_time).replace(tzinfo=None)
         except (KeyError, ValueError, AttributeError):
-            return self.mtime
+            pass
+        return self.mtime
+
+    def _mp4_header(self) -> tuple[str, int, int] | None:
+        """Return `(codec, width, height)` read from the MP4/MOV header, if not probed yet."""
+        if self._probe is None and self.suffix.lower() in MP4_SUFFIXES:
+            return mp4_video_header(self.path)
+        return None
 
     @property
     def codec(self) -> str | None:
         """Codec eg `H264` | `H265`."""
-        return self.metadata.codec
+        if (header := self._mp4_header()) is not None:
+            return header[0]
+        return self.stream_info.codec
 
     @property
     def dimensions(self) -> tuple[int, int] | None:
         """Return width and height of the video `(1920x1080)`."""
-        return self.metadata.frame_size
+        if (header := self._mp4_header()) is not None and header[1] and header[2]:
+            return header[1], header[2]
+        info = self.stream_info
+        if info.width and info.height:
+            return info.width, info.height
+        return None
 
     @property
     def is_corrupt(self) -> bool:
-        """Check if the video is corrupt."""
-        try:
-            cap = cv2.VideoCapture(self.path)
-            return not cap.isOpened()
-        except (OSError, SyntaxError):
-            return True  # Video is corrupt
-        except KeyboardInterrupt:
-            sys.exit(0)
+        """Check if the video is corrupt.
+
+        A video is considered intact when ffprobe can read its container header and
+        finds a video stream with a parseable duration. The result is cached, since a
+        failed probe isn't kept and would otherwise be retried on every check.
+        """
+        if self._is_corrupt is None:
+            try:
+                float(self.metadata.__dict__.get("duration") or self.probe.format["duration"])
+                self._is_corrupt = False
+            except (FFProbeError, KeyError, ValueError, OSError):
+                self._is_corrupt = True
+            except KeyboardInterrupt:
+                sys.exit(0)
+        return self._is_corrupt
 
     @property
     def fps(self) -> int:
         """Return the frames per second of the video."""
-        enum, denum = map(int, self.metadata.avg_frame_rate.split("/"))
-        return round(enum / denum)
+        return self.stream_info.fps
 
     @property
     def num_frames(self) -> int:
         """Return the number of frames in the video."""
         num_frames = 0
-        if hasattr(self.metadata, "nb_frames"):
-            num_frames = self.metadata.nb_frames
-        else:
+        try:
+            # ffprobe reports the count as a string; it is stored back as an int
+            num_frames = int(self.metadata.nb_frames)
+        except (AttributeError, ValueError):
             try:
-                num_frames = round(cv2.VideoCapture(self.path).get(cv2.CAP_PROP_FRAME_COUNT))
-                self.metadata.nb_frames = num_frames
+                cv2 = _cv2()
+                cap = cv2.VideoCapture(self.path)
+                try:
+                    num_frames = round(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                finally:
+                    cap.release()
             except Exception as e:
                 print(f"Error getting num_frames with cv2: {e!r}")
+                return num_frames
+        self.metadata.nb_frames = num_frames
         return num_frames
 
     def make_hq_gif(self, scale=640, fps=24, **kwargs) -> Img | None:
@@ -194,6 +393,8 @@ class Video(File):  # noqa: PLR0904
             **kwargs : dict
                 Additional arguments to pass to FFMPEG.
         """
+        from fsutils.img import Img
+
         _TMPFILE = "/tmp/palette.png"
         _fps = min(fps, self.fps)
         FILTERS = f"fps={_fps},scale={scale}:-1:flags=lanczos"
@@ -207,29 +408,60 @@ class Video(File):  # noqa: PLR0904
                 output_path.unlink()
             else:
                 print("Not overwriting existing file")
-                return Img(output_path)
+                return Img(str(output_path))
 
-        generate_palette_cmd = (
-            f'ffmpeg -i {self.path} -vf "{FILTERS},palettegen" -y -v error  -stats {_TMPFILE}'
-        )
-        generate_gif_cmd = f'ffmpeg -i {self.path} -i {_TMPFILE} -lavfi "{FILTERS} [x]; [x][1:v] paletteuse" -y -v error {output_path}'
+        generate_palette_cmd = [
+            "ffmpeg",
+            "-i",
+            self.path,
+            "-vf",
+            f"{FILTERS},palettegen",
+            "-y",
+            "-v",
+            "error",
+            "-stats",
+            _TMPFILE,
+        ]
+        generate_gif_cmd = [
+            "ffmpeg",
+            "-i",
+            self.path,
+            "-i",
+            _TMPFILE,
+            "-lavfi",
+            f"{FILTERS} [x]; [x][1:v] paletteuse",
+            "-y",
+            "-v",
+            "error",
+            str(output_path),
+        ]
         try:
-            subprocess.check_call(generate_palette_cmd, shell=True)
-            subprocess.check_call(generate_gif_cmd, shell=True)
-            result = Img(output_path)
+            subprocess.check_call(generate_palette_cmd)
+            subprocess.check_call(generate_gif_cmd)
+            result = Img(str(output_path))
             if result.exists():
                 return result
         except Exception as e:
             print(f"\033[31mError:\033[0m{e!r}")
         return None
 
-    def make_gif(self, scale=640, fps=15, **kwargs: Any) -> Img:
+    def make_gif(
+        self,
+        scale=640,
+        fps=15,
+        start: float = 0,
+        duration: float | None = None,
+        **kwargs: Any,
+    ) -> Img:
         """Convert the video to a gif using FFMPEG.
 
         Parameters
         -----------
             - `scale` : int, optional (default is 500)
             - `fps`   : int, optional (default is 10)
+            - `start` : Offset in seconds to start the gif from (default is `0`)
+            - `duration` : Length of the gif in seconds (default is the rest of the video)
+            - `threads` : Number of threads ffmpeg may use (default lets ffmpeg decide)
 
             Breakdown:
             * `FPS` : Deault is 24 but the for smaller file sizes, try 6-10
@@ -244,6 +476,8 @@ class Video(File):  # noqa: PLR0904
         --------
             - `Img` : New `Img` object of the gif created from this video file.
         """
+        from fsutils.img import Img
+
         output = kwargs.get("output", f"{self.parent}/{self.prefix}{'.gif'}")
         output_path = Path(output)
         if output_path.exists():
@@ -251,27 +485,122 @@ class Video(File):  # noqa: PLR0904
                 output_path.unlink()
             else:
                 print("Not overwriting existing file")
-                return Img(output_path)
-        subprocess.check_output([
+                return Img(str(output_path))
+        subprocess.check_output(
+            self.make_gif_cmd(scale, fps, start, duration, output_path, kwargs.get("threads"))
+        )
+        return Img(str(output_path))
+
+    def make_gif_cmd(
+        self,
+        scale=640,
+        fps=15,
+        start: float = 0,
+        duration: float | None = None,
+        output: str | Path | None = None,
+        threads: int | None = None,
+    ) -> list[str]:
+        """Return the ffmpeg argv `make_gif()` runs, for callers that spawn it themselves."""
+        if output is None:
+            output = f"{self.parent}/{self.prefix}.gif"
+        # Seeking before `-i` skips to the nearest keyframe instead of decoding from the
+        # start, so only the requested section is decoded
+        seek = ["-ss", str(start)] if start else []
+        if duration is not None:
+            seek += ["-t", str(duration)]
+        if threads is not None:
+            seek = ["-threads", str(threads), "-filter_complex_threads", str(threads), *seek]
+        return [
             "ffmpeg",
+            *seek,
             "-i",
             f"{self.path}",
-            "-vf",
-            f"fps={fps},scale={scale!s}:-1:flags=lanczos",
+            "-filter_complex",
+            f"[0:v] fps={fps},scale={scale!s}:-1:flags=lanczos,split [a][b];"
+            "[a] palettegen [p];[b][p] paletteuse",
             "-v",
             "error",
             "-loglevel",
             "quiet",
-            f"{output_path}",
-        ])
-        return Img(output_path)
+            f"{output}",
+        ]
+
+    @staticmethod
+    def make_gif_batch(
+        videos: Iterable["Video"],
+        scale=640,
+        fps=15,
+        max_workers: int | None = None,
+        **kwargs: Any,
+    ) -> list[Img]:
+        """Convert multiple videos to gifs concurrently.
+
+        Each conversion runs in its own ffmpeg process. Existing gifs are asked about up front,
+        before anything is started, so prompts are not interleaved with running jobs.
 
-    def extract_frames(self, fps=1, **kwargs: Any) -> list[Img]:
+        Parameters
+        ----------
+            - `videos (Iterable[Video])` : The videos to convert
+            - `scale`, `fps` : See `Video.make_gif()`
+            - `max_workers (int)` : Maximum number of concurrent conversions (default is the number of cores)
+            - `**kwargs` : Passed through to `Video.make_gif()`. When more than one conversion
+                           runs at a time, `threads` defaults to splitting the cores between them.
+                           `output` is not accepted, each gif is written next to its video
+
+        Raises
+        ------
+            - `ValueError` : If `output` is given
+
+        Returns
+        -------
+            - `list[Img]` : The gifs created, in order of completion
+        """
+        from fsutils.img import Img
+
+        if "output" in kwargs:
+            # One output path can't be shared between videos
+            raise ValueError("`output` can only be given when converting a single video")
+        videos = [
+            vid
+            for vid in videos
+            if not os.path.exists(f"{vid.parent}/{vid.prefix}.gif")
+            or input(f"Overwrite {vid.prefix}.gif? (y/n): ").lower() in {"y", "yes"}
+        ]
+        if not videos:
+            return []
+        cpus = os.cpu_count() or 1
+        max_workers = min(max_workers or cpus, len(videos))
+        if max_workers > 1:
+            kwargs.setdefault("threads", max(1, cpus // max_workers))
+        start, duration, threads = (kwargs.get(k) for k in ("start", "duration", "threads"))
+
+        def run(vid: Video) -> Img:
+            cmd = vid.make_gif_cmd(scale, fps, start or 0, duration, None, threads)
+            # `-y` since overwrites were already confirmed above
+            subprocess.check_output([*cmd[:-1], "-y", cmd[-1]])
+            return Img(cmd[-1])
+
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run, vid): vid for vid in videos}
+            for count, future in enumerate(as_completed(futures), start=1):
+                vid = futures[future]
+                try:
+                    results.append(future.result())
+                    print(f"[{count}/{len(videos)}] {vid.name}")
+                except Exception as e:
+                    print(f"\033[31mError:\033[0m {vid.name}: {e!r}")
+        return results
+
+    def extract_frames(
+        self, fps=1, timestamps: Iterable[float] | None = None, **kwargs: Any
+    ) -> list[Img]:
         """Extract frames from video.
 
         Paramaters
         -----------
             - `fps` : Frames per second to extract (default is `1`)
+            - `timestamps` : Extract only the frames at these times (seconds) instead of at a fixed rate
 
         Kwargs:
         ------------------
@@ -279,47 +608,110 @@ class Video(File):  # noqa: PLR0904
 
 
         """
+        from fsutils.img import Img
+
         # Define output
         output_dir = Path(kwargs.get("output", f"{self.name}-frames/"))
         Path.mkdir(output_dir, parents=True, exist_ok=True)
-        cap = cv2.VideoCapture(self.path)
-        # Init opencv video capture object and get properties
-        clip_fps = round(cap.get(cv2.CAP_PROP_FPS))
-        num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        interval = round(min(clip_fps, fps))
-        frametime_refs = frametimes(num_frames, clip_fps, interval)
-
-        saved_frames = []
-        count = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frametime = count / clip_fps
-            try:
-                # get the earliest duration to save
-                closest_duration = frametime_refs[0]
-            except IndexError:
-                # the list is empty, all duration frames were saved
-                break
-            if frametime >= closest_duration:
-                # if closest duration is less than or equals the frametime,
-                # then save the frame
+        # Init opencv video capture object with an explicit ffmpeg backend and get properties
+        cv2 = _cv2()
+        cap = cv2.VideoCapture(self.path, cv2.CAP_FFMPEG)
+        clip_fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        if timestamps is not None:
+            frametime_refs = deque(sorted(timestamps))
+        else:
+            num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            interval = round(min(round(clip_fps), fps))
+            frametime_refs = deque(frametimes(num_frames, round(clip_fps), interval))
+
+        # Half a frame of slack when deciding whether the decoder has reached a target
+        half_frame = 0.5 / clip_fps
+        # Time of the last decoded frame, `None` until something has been decoded
+        position = None
+        written = []
+        pending = deque()
+        writer = ThreadPoolExecutor(max_workers=4)
+        try:
+            while frametime_refs and cap.isOpened():
+                frametime = frametime_refs.popleft()
+                # Seeking lands on the keyframe before the target and decodes forward from
+                # there, so it only pays off across gaps longer than a typical GOP. Closer
+                # targets are reached by grabbing (decoding without converting) forward.
+                if position is None or not 0 <= frametime - position <= _SEEK_GAP:
+                    cap.set(cv2.CAP_PROP_POS_MSEC, frametime * 1000)
+                    ret = cap.grab()
+                else:
+                    ret = True
+                    while ret and position + half_frame < frametime:
+                        ret = cap.grab()
+                        position = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                if not ret:
+                    break
+                position = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
                 output_path = Path(
                     output_dir, f"frame{format_timedelta(timedelta(seconds=frametime))}.jpg"
                 )
-                print(f"Writing frame {count} to {output_path}")
-                cv2.imwrite(
-                    output_path,
-                    frame,
-                )  # type: ignore
-                saved_frames.append(Img(output_path))
-                # drop the duration spot from the list, since this duration spot is already saved
-                with contextlib.suppress(IndexError):
-                    frametime_refs.pop(0)
-            # increment the frame count
-            count += 1
-        return saved_frames
+                print(f"Writing frame at {frametime:.2f}s to {output_path}")
+                # Bound the frames held in memory waiting to be encoded
+                if len(pending) >= _MAX_PENDING_WRITES:
+                    written.append(pending.popleft().result())
+                # Copy the frame since opencv reuses the decode buffer on the next read
+                pending.append(writer.submit(_write_jpeg, output_path, frame.copy()))
+        finally:
+            cap.release()
+            writer.shutdown(wait=True)
+        written.extend(future.result() for future in pending)
+        return [Img(str(path)) for path in written]
+
+    def iter_frames(self, pix_fmt: str = "rgb24") -> Iterator[np.ndarray]:
+        """Yield decoded frames as `uint8` arrays of shape `(height, width, channels)`.
+
+        Frames are piped straight out of a single ffmpeg decode, so nothing is encoded
+        or written to disk.
+
+        Paramaters
+        -----------
+            - `pix_fmt` : One of `rgb24`, `bgr24` or `gray` (default is `rgb24`)
+
+        Raises
+        ------
+            - `ValueError` : If the video's dimensions can't be read
+            - `CalledProcessError` : If ffmpeg fails to decode the video, with its log as `stderr`
+        """
+        import numpy as np
+
+        channels = {"rgb24": 3, "bgr24": 3, "gray": 1}[pix_fmt]
+        if self.dimensions is None:
+            raise ValueError(f"Can't read the dimensions of {self.name}")
+        width, height = self.dimensions
+        frame_size = width * height * channels
+        # Frames are kept in their stored orientation so they match `dimensions`. Otherwise
+        # ffmpeg applies the rotation of eg. portrait phone clips and the frames come out h x w
+        cmd = ["ffmpeg", "-v", "error", "-noautorotate", "-i", self.path]
+        cmd += ["-f", "rawvideo", "-pix_fmt", pix_fmt, "-"]
+        # ffmpeg's log goes to a file rather than the terminal: stopping early closes the pipe
+        # under it, which makes ffmpeg print a burst of broken pipe errors. The log is only
+        # shown if the decode itself fails
+        with tempfile.TemporaryFile() as log:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=log, bufsize=frame_size)
+            exhausted = False
+            try:
+                while len(buf := proc.stdout.read(frame_size)) == frame_size:
+                    yield np.frombuffer(buf, np.uint8).reshape(height, width, channels)
+                exhausted = True
+            finally:
+                # Only stop ffmpeg if the caller stopped iterating early
+                if not exhausted and proc.poll() is None:
+                    proc.terminate()
+                proc.stdout.close()
+                returncode = proc.wait()
+            if returncode:
+                log.seek(0)
+                stderr = log.read().decode(errors="replace")
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
 
     def subclip(self, start_: int, end_: int, output: str | Path) -> "Video":
         """Trim the video from start to end time (seconds).
@@ -330,16 +722,23 @@ class Video(File):  # noqa: PLR0904
             - `end_ int` : (default is 100)
             - `output (str)` : (default is current working directory)
         """
-
-        template = "{}:{}"
-        start = template.format(*divmod(start_, 60))
-        end = template.format(*divmod(end_, 60))
-
-        output_path = Path(output).resolve()
-        subprocess.check_call(
-            f"ffmpeg -ss {start} -to {end} -i {self!s} -codec copy -v quiet -y {output_path}",
-            shell=True,
-        )
+        output_path = os.path.abspath(os.path.expanduser(output))
+        # ffmpeg accepts plain seconds for -ss/-to
+        subprocess.check_call([
+            "ffmpeg",
+            "-ss",
+            str(start_),
+            "-to",
+            str(end_),
+            "-i",
+            self.path,
+            "-codec",
+            "copy",
+            "-v",
+            "quiet",
+            "-y",
+            output_path,
+        ])
         return Video(output_path)
 
     def compress(self, **kwargs: Any) -> "Video":
@@ -349,16 +748,22 @@ class Video(File):  # noqa: PLR0904
         ----------------
         The following default ffmpeg params can be modifed by specifying them as keyword arguments
 
-        | Flag         | Default Parameters |
-        | :-------     | ------------------:|
-        | -c:v         | hevc_nvenc         |
-        | -crf         | 20                 |
-        | -qp          | 24                 |
-        | -rc          | constqp            |
-        | -preset      | slow               |
-        | -tune        | hq                 |
-        | -v           | quiet              |
-        | --output     | ./origname.mp4     |
+        | Flag         | Default Parameters   |
+        | :-------     | --------------------:|
+        | -c:v         | hevc_nvenc           |
+        | -crf         | 20                   |
+        | -qp          | 24                   |
+        | -rc          | constqp (NVENC only) |
+        | -preset      | slow                 |
+        | -tune        | hq (NVENC only)      |
+        | -threads     | 0 (auto)             |
+        | -hwaccel     | cuda                 |
+        | -v           | quiet                |
+        | --progress   | True                 |
+        | --output     | ./origname.mp4       |
+
+        With `progress=False` ffmpeg's stats are turned off and its log is not printed;
+        only the last lines are kept and attached to the error if the encode fails.
 
         Examples
         --------
@@ -367,6 +772,18 @@ class Video(File):  # noqa: PLR0904
         vid.compress(output="~/Videos/compressed_video.mp4", codec="hevc_nvenc")
         ```
         """
+        ffmpeg_cmd = self.compress_cmd(**kwargs)
+        # print the ffmpeg command with filled in vars
+        print(" ".join(ffmpeg_cmd))
+
+        if kwargs.get("progress", CompressOptions.progress):
+            subprocess.check_call(ffmpeg_cmd)
+        else:
+            _run_with_log_tail(ffmpeg_cmd)
+        return Video(ffmpeg_cmd[-1])
+
+    def compress_cmd(self, **kwargs: Any) -> list[str]:
+        """Return the ffmpeg argv `compress()` runs. The output path is the last item."""
         try:
             output = kwargs.pop("output")
         except KeyError:
@@ -376,37 +793,153 @@ class Video(File):  # noqa: PLR0904
 
         ffmpeg_cmd = [
             "ffmpeg",
+            "-threads",
+            str(options.threads),
+            "-filter_threads",
+            str(options.filter_threads),
+        ]
+        if options.hwaccel == "cuda" and "nvenc" in options.encoder and _has_hwaccel("cuda"):
+            # Decode on the GPU and keep frames in device memory so NVENC
+            # can consume them without a copy through host memory. Builds without
+            # CUDA decoding fall back to decoding on the CPU
+            ffmpeg_cmd += [
+                "-hwaccel",
+                "cuda",
+                "-hwaccel_output_format",
+                "cuda",
+                "-extra_hw_frames",
+                "8",
+            ]
+        ffmpeg_cmd += [
             "-i",
             self.path,
+            # Given before `-i` it only sizes the decoder; here it applies to the encoder too
+            "-threads",
+            str(options.threads),
             "-c:v",
             options.encoder,
             "-crf",
             str(options.crf),
             "-qp",
             str(options.qp),
-            "-rc",
-            options.rc,
             "-preset",
             options.preset,
+        ]
+        # `-rc` is an NVENC option and `hq` an NVENC tune, both rejected by x264/x265, so
+        # software encoders only get them when they were asked for explicitly
+        if "nvenc" in options.encoder or "rc" in kwargs:
+            ffmpeg_cmd += ["-rc", options.rc]
+        if "nvenc" in options.encoder or "tune" in kwargs:
+            ffmpeg_cmd += ["-tune", options.tune]
+        ffmpeg_cmd += [
             "-c:a",
             "copy",
             "-v",
             options.loglevel,
             "-y",
-            "-stats",
+            "-stats" if options.progress else "-nostats",
             options.output,
         ]
-        # print the ffmpeg command with filled in vars
-        print(" ".join(ffmpeg_cmd))
+        return ffmpeg_cmd
 
-        print(subprocess.check_output(ffmpeg_cmd))
-        return Video(options.output)
+    @staticmethod
+    def compress_batch(
+        videos: Iterable["Video"], max_workers: int | None = None, **kwargs: Any
+    ) -> list["Video"]:
+        """Compress multiple videos concurrently.
+
+        Each encode runs in its own ffmpeg process. Up to `max_workers` of them are started
+        and the next one is started as soon as any of them exits. When the encoder is NVENC and
+        ffmpeg supports it, the number of jobs is capped at `FSUTILS_NVENC_SESSIONS` (default 2).
+        Software encoders are multithreaded themselves, so they default to half the cores.
+
+        Parameters
+        ----------
+            - `videos (Iterable[Video])` : The videos to compress
+            - `max_workers (int)` : Maximum number of concurrent encodes (default depends on the encoder)
+            - `**kwargs` : Passed through to `Video.compress()`. Unless `progress` is given,
+                           ffmpeg's progress is only shown when encodes run one at a time.
+                           `output` is only accepted for a single video
+
+        Raises
+        ------
+            - `ValueError` : If `output` is given along with more than one video
+
+        Returns
+        -------
+            - `list[Video]` : The compressed videos, in order of completion
+        """
+        videos = list(videos)
+        if not videos:
+            return []
+        if "output" in kwargs and len(videos) > 1:
+            # Every encode would overwrite the same file
+            raise ValueError("`output` can only be given when compressing a single video")
+        if max_workers is None:
+            encoder = kwargs.get("encoder", CompressOptions.encoder)
+            if "nvenc" in encoder and _has_encoder(encoder):
+                max_workers = NVENC_SESSIONS
+            else:
+                max_workers = max(1, (os.cpu_count() or 2) // 2)
+        max_workers = min(max_workers, len(videos))
+        # Interleaved progress lines from concurrent encodes are unreadable
+        kwargs.setdefault("progress", max_workers == 1)
+        if max_workers > 1:
+            # Split the cores between jobs instead of each ffmpeg sizing itself to all of them
+            kwargs.setdefault("threads", max(1, (os.cpu_count() or 1) // max_workers))
+
+        results = []
+        queue = iter(videos)
+        # pid -> (video, argv, process, stderr tail, stderr drain thread)
+        pending: dict[
+            int, tuple[Video, list[str], subprocess.Popen, deque[str] | None, threading.Thread | None]
+        ] = {}
+        count = 0
+
+        def start_next() -> None:
+            nonlocal count
+            for vid in queue:
+                try:
+                    cmd = vid.compress_cmd(**kwargs)
+                    print(" ".join(cmd))
+                    if kwargs["progress"]:
+                        proc, tail, drain = subprocess.Popen(cmd), None, None
+                    else:
+                        proc, tail, drain = _start_with_log_tail(cmd)
+                except Exception as e:
+                    count += 1
+                    print(f"\033[31mError:\033[0m {vid.name}: {e!r}")
+                    continue
+                pending[proc.pid] = (vid, cmd, proc, tail, drain)
+                return
+
+        for _ in range(max_workers):
+            start_next()
+        while pending:
+            # Poll only our own encodes; `os.wait()` would also reap children started elsewhere
+            # in the process and leave their Popen objects unable to collect the status
+            done = next((pid for pid, job in pending.items() if job[2].poll() is not None), None)
+            if done is None:
+                time.sleep(0.1)
+                continue
+            vid, cmd, proc, tail, drain = pending.pop(done)
+            start_next()
+            if drain is not None:
+                drain.join()
+                proc.stderr.close()
+            count += 1
+            if proc.returncode:
+                print(f"\033[31mError:\033[0m {vid.name}: ffmpeg exited with {proc.returncode}")
+                if tail:
+                    print("".join(tail), end="")
+            else:
+                results.append(Video(cmd[-1]))
+                print(f"[{count}/{len(videos)}] {vid.name}")
+        return results
 
     def __repr__(self) -> str:
         """Return a string representation of the file."""
-        return f"{self.__class__.__name__}(name={self.name}, size={self.size_human})".format(
-            **vars(self)
-        )
+        return f"{self.__class__.__name__}(name={self.name}, size={self.size_human})"
 
     def sha256(self) -> str:
         return super().sha256()
@@ -417,7 +950,6 @@ class Video(File):  # noqa: PLR0904
 
     def __format__(self, format_spec: str, /) -> str:
         """Return the object in tabular format."""
-        template = "{:<25} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10} | {!s:<10}"
         name = self.name
         iterations = 0
         while len(name) > 20 and iterations < 5:  # Protection from infinite loop
@@ -426,24 +958,21 @@ class Video(File):  # noqa: PLR0904
             else:
                 name = ".".join([name.split(".")[0], name.split(".")[-1]])
             iterations += 1
-        return template.format(
+        return _format_row(
             name.strip(),
             self.num_frames,
             self.bitrate_human,
             self.size_human,
             self.codec,
             self.duration,
-            self.metadata.frame_rate,
+            self.fps,
             self.dimensions,
         )
 
     @staticmethod
     def fmtheader() -> str:
-        template = "{:<25} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10}\n"
-        header = template.format(
+        header = _format_row(
             "File", "Num Frames", "Bitrate", "Size", "Codec", "Duration", "FPS", "Dimensions"
         )
-        linebreak = template.format(
-            "-" * 25, "-" * 10, "-" * 10, "-" * 10, "-" * 10, "-" * 10, "-" * 10, "-" * 10
-        )
-        return f"\033[1m{header}\033[0m{linebreak}"
+        linebreak = _format_row("-" * 25, *["-" * 10] * 7)
+        return f"\033[1m{header}\n\033[0m{linebreak}\n"
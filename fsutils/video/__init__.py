@@ -1,2 +1,2 @@
-from .FFProbe import FFProbe, FFStream
+from .FFProbe import FFProbe, FFStream, probe_many, prune_cache
 from .VideoFile import Video
@@ -20,12 +20,17 @@ fstuils video compress video.mp4 --output=/path/to/result.MOV
 
 import argparse
 import contextlib
-from typing import Any
-
-from ThreadPoolHelper import Pool
+import logging
+import os
+import sys
+from itertools import batched, chain
+from typing import TYPE_CHECKING, Any
 
 from ..utils.mimecfg import FILE_TYPES
-from .VideoFile import Video
+
+# Imported once the arguments have been parsed so `--help` stays fast
+if TYPE_CHECKING:
+    from .VideoFile import Video
 
 video_types = tuple(FILE_TYPES["video"])
 
@@ -104,7 +109,9 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def main(videos: list[Video], action: str, **kwargs) -> Any:
+def main(videos: list["Video"], action: str, **kwargs) -> Any:
+    from .VideoFile import Video
+
     match action:
         case "makegif":
             if "quality" in kwargs:
@@ -112,17 +119,18 @@ def main(videos: list[Video], action: str, **kwargs) -> Any:
                     vid.make_hq_gif(**kwargs)
                 return
 
-            for vid in videos:
-                vid.make_gif(**kwargs)
+            Video.make_gif_batch(videos, **kwargs)
         case "info":
-            print(Video.fmtheader())
-            print("\n".join(sorted(Pool().execute(format, videos, progress_bar=False))))
+            # Probe everything up front in parallel; formatting is then in-memory
+            Video.prefetch_metadata(videos)
+            # Order by name up front so rows can be written as they are formatted, a batch
+            # per write instead of a flush per row on a terminal
+            videos.sort(key=lambda vid: vid.name)
+            rows = chain([f"{Video.fmtheader()}\n"], (f"{vid}\n" for vid in videos))
+            for batch in batched(rows, 256):
+                sys.stdout.write("".join(batch))
         case "compress":
-            for vid in videos:
-                try:
-                    vid.compress(**kwargs)
-                except Exception as e:
-                    print(f"{e!r}")
+            Video.compress_batch(videos, **kwargs)
         case _:
             print("\033[31mError:\033[0m ", action, "is not a known action")
 
@@ -130,21 +138,24 @@ def main(videos: list[Video], action: str, **kwargs) -> Any:
 def parse_kwargs(*args) -> dict:
     kwargs_dict = {}
     for arg in args:
-        if "=" not in arg:
+        key, sep, value = arg.partition("=")
+        if not sep:
             continue
-        key, value = arg.split("=", 1)
-        with contextlib.suppress(ValueError):
-            value = int(value)  # Try to convert to integer if possible
-        kwargs_dict[key.strip("-")] = value
+        # Convert to integer if possible, checked up front rather than by catching int()'s error
+        kwargs_dict[key.strip("-")] = int(value) if value.removeprefix("-").isdecimal() else value
     return kwargs_dict
 
 
 if __name__ == "__main__":
     args = parse_args()
-    print("VIDEOS: ", args.PATH)
+    from .VideoFile import Video
+
+    logging.basicConfig(level=os.environ.get("FSUTILS_LOG", "WARNING").upper())
+    log = logging.getLogger("fsutils")
+    log.debug("paths=%r", args.PATH)
     kwargs = {}
     with contextlib.suppress(AttributeError):
         kwargs = parse_kwargs(*args.kwargs)
     videos = [Video(vid) for vid in args.PATH if vid.endswith(video_types)]
-    print(kwargs)
+    log.debug("kwargs=%r", kwargs)
     main(videos=videos, action=args.action, **kwargs)
@@ -0,0 +1,105 @@
+"""Read the video codec and dimensions straight from an MP4/MOV header.
+
+For ISO base media files the fields `Video.codec` and `Video.dimensions` need are in the
+`moov` box, so a handful of seeks and small reads answer them without spawning ffprobe.
+Anything unexpected returns `None` and the caller falls back to probing.
+"""
+
+import os
+import struct
+from collections.abc import Iterator
+from functools import lru_cache
+
+MP4_SUFFIXES = frozenset({".mp4", ".mov", ".m4v"})
+
+# Sample entry fourcc -> the codec name ffprobe reports. `mp4v` is left out since it can be
+# any of several MPEG codecs depending on the decoder config
+_FOURCC_CODECS = {
+    b"avc1": "h264",
+    b"avc3": "h264",
+    b"hvc1": "hevc",
+    b"hev1": "hevc",
+    b"av01": "av1",
+    b"vp09": "vp9",
+    b"apch": "prores",
+    b"apcn": "prores",
+    b"apcs": "prores",
+    b"apco": "prores",
+    b"ap4h": "prores",
+    b"ap4x": "prores",
+}
+
+
+def _boxes(f, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """Yield `(type, payload_start, box_end)` for each box between `start` and `end`."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header[:8])
+        payload = pos + 8
+        if size == 1:  # 64-bit size follows the type
+            if len(header) < 16:
+                return
+            (size,) = struct.unpack(">Q", header[8:])
+            payload += 8
+        elif size == 0:  # Box extends to the end of its parent
+            size = end - pos
+        if size < payload - pos:
+            return
+        yield kind, payload, pos + size
+        pos += size
+
+
+def _find(f, start: int, end: int, *path: bytes) -> tuple[int, int] | None:
+    """Return `(payload_start, box_end)` of the first box at `path` below `start:end`."""
+    for kind, payload, box_end in _boxes(f, start, end):
+        if kind == path[0]:
+            return (payload, box_end) if len(path) == 1 else _find(f, payload, box_end, *path[1:])
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _read_header(path: str, size: int, mtime_ns: int) -> tuple[str, int, int] | None:
+    """Parse `path`; `size` and `mtime_ns` only key the cache."""
+    with open(path, "rb") as f:
+        # ISO base media files start with an `ftyp` box
+        f.seek(4)
+        if f.read(4) != b"ftyp":
+            return None
+        moov = _find(f, 0, size, b"moov")
+        if moov is None:
+            return None
+        for kind, payload, box_end in _boxes(f, *moov):
+            if kind != b"trak":
+                continue
+            hdlr = _find(f, payload, box_end, b"mdia", b"hdlr")
+            if hdlr is None:
+                continue
+            # version/flags, pre_defined, handler_type
+            f.seek(hdlr[0] + 8)
+            if f.read(4) != b"vide":
+                continue
+            stsd = _find(f, payload, box_end, b"mdia", b"minf", b"stbl", b"stsd")
+            if stsd is None:
+                return None
+            # Skip version/flags and entry_count. The first visual sample entry has its
+            # fourcc at 4 and 16-bit width/height at 32/34
+            f.seek(stsd[0] + 8)
+            entry = f.read(36)
+            if len(entry) < 36 or (codec := _FOURCC_CODECS.get(entry[4:8])) is None:
+                return None
+            width, height = struct.unpack(">HH", entry[32:36])
+            return codec, width, height
+    return None
+
+
+def mp4_video_header(path: str) -> tuple[str, int, int] | None:
+    """Return `(codec, width, height)` of the first video track, or `None` if it can't be read."""
+    try:
+        st = os.stat(path)
+        return _read_header(path, st.st_size, st.st_mtime_ns)
+    except (OSError, struct.error):
+        return None